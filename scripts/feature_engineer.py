@@ -6,12 +6,175 @@ Create advanced time series features for sales forecasting
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from scipy.stats import linregress
+from pathlib import Path
+import hashlib
+import os
+import shutil
+import tempfile
+from numba import njit
+import polars as pl
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+@njit(cache=True)
+def _rolling_slope(y, w):
+    """
+    OLS slope of y against 0..n-1 over a trailing window of size w
+
+    The first w-1 points use an expanding window. Running sums are
+    updated in O(1) per step instead of refitting each window. Non-finite
+    values enter the sums as 0 and are counted instead, so a window
+    containing one reports NaN (as linregress does) without poisoning
+    the windows after it.
+    """
+    n = len(y)
+    out = np.empty(n)
+    sum_y = 0.0
+    sum_xy = 0.0
+    bad = 0
+    
+    for i in range(n):
+        v = y[i]
+        if not np.isfinite(v):
+            bad += 1
+            v = 0.0
+        
+        if i < w:
+            # Expanding window: x = 0..i
+            sum_y += v
+            sum_xy += i * v
+            k = i + 1
+        else:
+            # Slide window: drop y[i-w], shift x down by one, add y[i] at x = w-1
+            old = y[i - w]
+            if not np.isfinite(old):
+                bad -= 1
+                old = 0.0
+            sum_y += v - old
+            sum_xy += (w - 1) * v - (sum_y - v)
+            k = w
+        
+        if k < 2:
+            out[i] = 0.0
+            continue
+        if bad > 0:
+            out[i] = np.nan
+            continue
+        
+        sum_x = k * (k - 1) / 2.0
+        sum_x2 = (k - 1) * k * (2 * k - 1) / 6.0
+        out[i] = (k * sum_xy - sum_x * sum_y) / (k * sum_x2 - sum_x * sum_x)
+    
+    return out
+
+
+@njit(cache=True)
+def _rolling_stats(y, w):
+    """
+    Trailing-window mean, std, min and max of y in a single pass
+
+    Matches pandas rolling(w, min_periods=1): NaNs are skipped, std uses
+    ddof=1. Mean/variance are updated with Welford add/remove steps and
+    min/max with monotonic index deques held in ring buffers of size w.
+    """
+    n = len(y)
+    mean_out = np.empty(n)
+    std_out = np.empty(n)
+    min_out = np.empty(n)
+    max_out = np.empty(n)
+    
+    count = 0
+    mean = 0.0
+    ssqdm = 0.0
+    # Length of the current run of identical values, so a constant
+    # window reports a std of exactly 0 instead of round-off noise
+    prev = np.nan
+    same = 0
+    
+    min_dq = np.empty(w, dtype=np.int64)
+    max_dq = np.empty(w, dtype=np.int64)
+    min_head = min_size = 0
+    max_head = max_size = 0
+    
+    for i in range(n):
+        # Remove the value leaving the window
+        if i >= w:
+            old = y[i - w]
+            if not np.isnan(old):
+                count -= 1
+                if count > 0:
+                    delta = old - mean
+                    mean -= delta / count
+                    ssqdm -= delta * (old - mean)
+                else:
+                    mean = 0.0
+                    ssqdm = 0.0
+            if min_size > 0 and min_dq[min_head] == i - w:
+                min_head = (min_head + 1) % w
+                min_size -= 1
+            if max_size > 0 and max_dq[max_head] == i - w:
+                max_head = (max_head + 1) % w
+                max_size -= 1
+        
+        # Add the new value
+        val = y[i]
+        if not np.isnan(val):
+            count += 1
+            delta = val - mean
+            mean += delta / count
+            ssqdm += delta * (val - mean)
+            if val == prev:
+                same += 1
+            else:
+                same = 1
+                prev = val
+            
+            while min_size > 0 and y[min_dq[(min_head + min_size - 1) % w]] >= val:
+                min_size -= 1
+            min_dq[(min_head + min_size) % w] = i
+            min_size += 1
+            
+            while max_size > 0 and y[max_dq[(max_head + max_size - 1) % w]] <= val:
+                max_size -= 1
+            max_dq[(max_head + max_size) % w] = i
+            max_size += 1
+        
+        if count == 0:
+            mean_out[i] = std_out[i] = min_out[i] = max_out[i] = np.nan
+            continue
+        
+        mean_out[i] = mean
+        if count < 2:
+            std_out[i] = np.nan
+        elif same >= count:
+            std_out[i] = 0.0
+        else:
+            std_out[i] = np.sqrt(max(ssqdm, 0.0) / (count - 1))
+        min_out[i] = y[min_dq[min_head]]
+        max_out[i] = y[max_dq[max_head]]
+    
+    return mean_out, std_out, min_out, max_out
+
+
+def _group_mean(keys, y, size):
+    """
+    Mean of y over all rows sharing each row's integer key in [0, size)
+
+    NaNs in y are skipped. Rows whose key is missing (NaN) or out of range
+    belong to no group and get NaN, as groupby/transform would give them.
+    """
+    keys = np.asarray(keys, dtype=np.float64)
+    has_key = (keys >= 0) & (keys < size)
+    keys = np.where(has_key, keys, 0).astype(np.intp)
+    valid = has_key & ~np.isnan(y)
+    sums = np.bincount(keys[valid], weights=y[valid], minlength=size)
+    counts = np.bincount(keys[valid], minlength=size)
+    table = np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+    return np.where(has_key, table[keys], np.nan)
+
+
 class TimeSeriesFeatureEngineer:
     """Generate advanced time series features"""
     
@@ -29,91 +192,123 @@ class TimeSeriesFeatureEngineer:
         self.target_col = target_col
         self.features = None
     
+    def _add_columns(self, new):
+        """Add a dict of columns to self.df in a single concat, replacing existing ones"""
+        base = self.df.drop(columns=list(new), errors='ignore')
+        self.df = pd.concat([base, pd.DataFrame(new, index=self.df.index)], axis=1)
+    
     def create_time_features(self):
         """Extract time-based features"""
-        df = self.df.copy()
-        
         # Ensure date is datetime
-        df[self.date_col] = pd.to_datetime(df[self.date_col])
+        self.df[self.date_col] = pd.to_datetime(self.df[self.date_col])
+        dates = self.df[self.date_col]
+        d = dates.dt
+        new = {}
+        
+        # Work from whole days since the epoch (1970-01-01 was a Thursday),
+        # counted in local wall time so they agree with the .dt fields.
+        # NaT rows are computed from placeholder values and masked below.
+        nat = dates.isna().to_numpy()
+        valid = ~nat
+        if d.tz is not None:
+            dates = d.tz_localize(None)
+        days = np.where(nat, 0, dates.to_numpy().astype('datetime64[D]').view('i8'))
+        month = d.month.to_numpy(np.int8, na_value=1)
+        day = d.day.to_numpy(np.int8, na_value=1)
+        day_of_week = ((days + 3) % 7).astype(np.int8)
+        
+        # ISO week is the week of the year containing that week's Thursday
+        thursday = days - day_of_week + 3
+        jan_first = thursday.astype('datetime64[D]').astype('datetime64[Y]').astype('datetime64[D]').view('i8')
+        
+        # Basic time features, stored in the smallest integer type that fits
+        new['year'] = d.year.to_numpy(np.int16, na_value=1970)
+        new['month'] = month
+        new['day'] = day
+        new['day_of_week'] = day_of_week
+        new['day_of_year'] = d.dayofyear.to_numpy(np.int16, na_value=1)
+        new['quarter'] = (month - 1) // 3 + 1
+        new['week_of_year'] = ((thursday - jan_first) // 7 + 1).astype(np.int8)
         
-        # Basic time features
-        df['year'] = df[self.date_col].dt.year
-        df['month'] = df[self.date_col].dt.month
-        df['day'] = df[self.date_col].dt.day
-        df['day_of_week'] = df[self.date_col].dt.dayofweek
-        df['day_of_year'] = df[self.date_col].dt.dayofyear
-        df['quarter'] = df[self.date_col].dt.quarter
-        df['week_of_year'] = df[self.date_col].dt.isocalendar().week
+        # Calendar parts of NaT rows are missing, so those columns fall
+        # back to float with NaN, as the .dt accessor gives them
+        if nat.any():
+            for name in list(new):
+                new[name] = np.where(nat, np.nan, new[name])
         
-        # Boolean features
-        df['is_weekend'] = (df['day_of_week'] >= 5).astype(int)
-        df['is_month_start'] = df[self.date_col].dt.is_month_start.astype(int)
-        df['is_month_end'] = df[self.date_col].dt.is_month_end.astype(int)
-        df['is_quarter_start'] = df[self.date_col].dt.is_quarter_start.astype(int)
-        df['is_quarter_end'] = df[self.date_col].dt.is_quarter_end.astype(int)
-        df['is_year_start'] = df[self.date_col].dt.is_year_start.astype(int)
-        df['is_year_end'] = df[self.date_col].dt.is_year_end.astype(int)
+        # Boolean features as 1-byte flags; NaT rows are never flagged
+        month_start = (day == 1) & valid
+        month_end = (day == d.days_in_month.to_numpy(np.int8, na_value=0)) & valid
+        quarter_month = (month - 1) % 3
+        new['is_weekend'] = ((day_of_week >= 5) & valid).view(np.uint8)
+        new['is_month_start'] = month_start.view(np.uint8)
+        new['is_month_end'] = month_end.view(np.uint8)
+        new['is_quarter_start'] = (month_start & (quarter_month == 0)).view(np.uint8)
+        new['is_quarter_end'] = (month_end & (quarter_month == 2)).view(np.uint8)
+        new['is_year_start'] = (month_start & (month == 1)).view(np.uint8)
+        new['is_year_end'] = (month_end & (month == 12)).view(np.uint8)
         
-        logger.info(f"✓ Created time-based features ({len(df.columns) - len(self.df.columns)} new)")
-        self.df = df
-        return df
+        self._add_columns(new)
+        logger.info(f"✓ Created time-based features ({len(new)} new)")
+        return self.df
     
     def create_rolling_features(self, windows=[7, 14, 30, 90, 365]):
         """Create rolling window aggregations"""
-        df = self.df.copy()
+        y = self.df[self.target_col].to_numpy(dtype=np.float64)
+        new = {}
         
         for window in windows:
-            df[f'rolling_mean_{window}'] = df[self.target_col].rolling(window, min_periods=1).mean()
-            df[f'rolling_std_{window}'] = df[self.target_col].rolling(window, min_periods=1).std()
-            df[f'rolling_min_{window}'] = df[self.target_col].rolling(window, min_periods=1).min()
-            df[f'rolling_max_{window}'] = df[self.target_col].rolling(window, min_periods=1).max()
+            mean, std, min_, max_ = _rolling_stats(y, window)
+            new[f'rolling_mean_{window}'] = mean
+            new[f'rolling_std_{window}'] = std
+            new[f'rolling_min_{window}'] = min_
+            new[f'rolling_max_{window}'] = max_
         
+        self._add_columns(new)
         logger.info(f"✓ Created rolling window features for windows: {windows}")
-        self.df = df
-        return df
+        return self.df
     
     def create_lag_features(self, lags=[1, 7, 14, 30, 365]):
         """Create lag features"""
-        df = self.df.copy()
-        
-        for lag in lags:
-            df[f'lag_{lag}'] = df[self.target_col].shift(lag)
-        
-        # Rate of change
-        df['diff_1'] = df[self.target_col].diff(1)
-        df['diff_7'] = df[self.target_col].diff(7)
-        df['diff_30'] = df[self.target_col].diff(30)
-        
-        # Percentage change
-        df['pct_change_1'] = df[self.target_col].pct_change(1)
-        df['pct_change_7'] = df[self.target_col].pct_change(7)
+        # Evaluate all shift-based expressions in one lazy Polars query
+        target = pl.col(self.target_col)
+        y = pl.Series(self.target_col, self.df[self.target_col].to_numpy(dtype=np.float64))
+        shifted = pl.LazyFrame([y]).select(
+            # Lags
+            [target.shift(lag).alias(f'lag_{lag}') for lag in lags]
+            # Rate of change
+            + [target.diff(n).alias(f'diff_{n}') for n in (1, 7, 30)]
+            # Percentage change
+            + [target.pct_change(n).alias(f'pct_change_{n}') for n in (1, 7)]
+        ).collect()
         
+        self._add_columns({name: shifted[name].to_numpy() for name in shifted.columns})
         logger.info(f"✓ Created lag features for lags: {lags}")
-        self.df = df
-        return df
+        return self.df
     
     def create_seasonal_features(self):
         """Create seasonality indicators"""
-        df = self.df.copy()
+        y = self.df[self.target_col].to_numpy(dtype=np.float64)
+        new = {}
         
         # Monthly seasonality
-        monthly_avg = df.groupby('month')[self.target_col].mean().to_dict()
-        df['monthly_avg'] = df['month'].map(monthly_avg)
-        df['monthly_seasonality'] = df[self.target_col] / (df['monthly_avg'] + 1e-6)
+        month = self.df['month'].to_numpy(np.float64) - 1
+        new['monthly_avg'] = _group_mean(month, y, 12)
+        new['monthly_seasonality'] = y / (new['monthly_avg'] + 1e-6)
         
         # Day-of-week seasonality
-        dow_avg = df.groupby('day_of_week')[self.target_col].mean().to_dict()
-        df['dow_avg'] = df['day_of_week'].map(dow_avg)
-        df['dow_seasonality'] = df[self.target_col] / (df['dow_avg'] + 1e-6)
+        dow = self.df['day_of_week'].to_numpy(np.float64)
+        new['dow_avg'] = _group_mean(dow, y, 7)
+        new['dow_seasonality'] = y / (new['dow_avg'] + 1e-6)
         
         # Quarter seasonality
-        quarter_avg = df.groupby('quarter')[self.target_col].mean().to_dict()
-        df['quarter_avg'] = df['quarter'].map(quarter_avg)
-        df['quarter_seasonality'] = df[self.target_col] / (df['quarter_avg'] + 1e-6)
+        quarter = self.df['quarter'].to_numpy(np.float64) - 1
+        new['quarter_avg'] = _group_mean(quarter, y, 4)
+        new['quarter_seasonality'] = y / (new['quarter_avg'] + 1e-6)
         
+        self._add_columns(new)
         logger.info("✓ Created seasonal features")
-        self.df = df
-        return df
+        return self.df
     
     def create_holiday_features(self, holidays=None):
         """Create holiday flags"""
@@ -128,57 +323,39 @@ class TimeSeriesFeatureEngineer:
                 'boxing_day': (12, 26),
             }
         
-        df = self.df.copy()
-        
-        for holiday_name, (month, day) in holidays.items():
-            df[f'is_{holiday_name}'] = ((df['month'] == month) & (df['day'] == day)).astype(int)
+        # Pack (month, day) into one code and compare against all holidays at once
+        # Missing month/day (NaT dates) become 0, which matches no holiday
+        month = self.df['month'].to_numpy(np.int16, na_value=0)
+        day = self.df['day'].to_numpy(np.int16, na_value=0)
+        code = (month << 5) | day
+        holiday_codes = np.array([(month << 5) | day for month, day in holidays.values()], dtype=np.int16)
+        hits = holiday_codes[:, None] == code[None, :]
         
+        self._add_columns({f'is_{holiday_name}': hits[i].view(np.uint8)
+                           for i, holiday_name in enumerate(holidays)})
         logger.info(f"✓ Created {len(holidays)} holiday features")
-        self.df = df
-        return df
+        return self.df
     
     def create_trend_features(self):
         """Create trend indicators"""
-        df = self.df.copy()
-        
-        def calc_trend(series, window=30):
-            trends = []
-            for i in range(len(series)):
-                if i < window:
-                    x = np.arange(i + 1)
-                    y = series.iloc[:i+1].values
-                else:
-                    x = np.arange(window)
-                    y = series.iloc[i-window+1:i+1].values
-                
-                if len(x) > 1:
-                    slope, _, _, _, _ = linregress(x, y)
-                    trends.append(slope)
-                else:
-                    trends.append(0)
-            
-            return pd.Series(trends, index=series.index)
-        
-        df['trend_7'] = calc_trend(df[self.target_col], window=7)
-        df['trend_30'] = calc_trend(df[self.target_col], window=30)
-        df['trend_90'] = calc_trend(df[self.target_col], window=90)
+        y = self.df[self.target_col].to_numpy(dtype=np.float64)
         
+        self._add_columns({
+            'trend_7': _rolling_slope(y, 7),
+            'trend_30': _rolling_slope(y, 30),
+            'trend_90': _rolling_slope(y, 90),
+        })
         logger.info("✓ Created trend features")
-        self.df = df
-        return df
+        return self.df
     
     def handle_missing_values(self):
         """Fill missing values created by feature engineering"""
-        df = self.df.copy()
-        
-        # Forward fill then backward fill
-        df = df.fillna(method='bfill').fillna(method='ffill').fillna(0)
+        # Backward fill then forward fill
+        self.df = self.df.bfill().ffill().fillna(0)
         
-        missing_count = df.isnull().sum().sum()
+        missing_count = self.df.isnull().sum().sum()
         logger.info(f"✓ Handled missing values (remaining: {missing_count})")
-        
-        self.df = df
-        return df
+        return self.df
     
     def get_features(self):
         """Get engineered feature dataframe"""
@@ -203,35 +380,100 @@ class TimeSeriesFeatureEngineer:
         return self.df
 
 
-def create_features_from_raw(input_path, output_path):
+# Bump whenever the feature code changes (kernels, holidays, dtypes) so
+# features cached by an older version are not served
+FEATURE_VERSION = 3
+
+
+def _feature_cache_key(input_path):
+    """Hash the raw file contents together with the feature version and parameters"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(input_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    
+    # Changing the default windows/lags must invalidate cached features
+    params = (
+        FEATURE_VERSION,
+        TimeSeriesFeatureEngineer.create_rolling_features.__defaults__,
+        TimeSeriesFeatureEngineer.create_lag_features.__defaults__,
+    )
+    digest.update(repr(params).encode())
+    return digest.hexdigest()
+
+
+def create_features_from_raw(input_path, output_path, cache_dir='.cache'):
     """
     Load raw data and create all features
     
+    Results are cached as Parquet keyed by the input file's content, so
+    repeated runs on unchanged data skip feature engineering entirely.
+    
     Args:
-        input_path (str): Path to raw CSV
-        output_path (str): Path to save engineered features
+        input_path (str): Path to raw CSV or Parquet file
+        output_path (str): Path to save engineered features; the suffix is
+            replaced with .parquet since features are always written as Parquet
+        cache_dir (str): Directory for cached feature files
     """
-    # Load data
-    df = pd.read_csv(input_path)
+    output_path = Path(output_path).with_suffix('.parquet')
+    cache_path = Path(cache_dir) / f'{_feature_cache_key(input_path)}.parquet'
+    if cache_path.exists():
+        shutil.copyfile(cache_path, output_path)
+        logger.info(f"✓ Loaded cached engineered features from {cache_path}")
+        return pd.read_parquet(cache_path)
+    
+    # Scan lazily so only the needed columns are read
+    is_parquet = str(input_path).lower().endswith('.parquet')
+    if is_parquet:
+        raw = pl.scan_parquet(input_path)
+        columns = raw.collect_schema().names()
+    else:
+        columns = pl.scan_csv(input_path, infer_schema=False).collect_schema().names()
     
     # Identify columns
-    date_col = [col for col in df.columns if 'date' in col.lower()][0]
-    sales_col = [col for col in df.columns if 'sales' in col.lower()][0]
+    date_col = [col for col in columns if 'date' in col.lower()][0]
+    sales_col = [col for col in columns if 'sales' in col.lower()][0]
+    
+    if not is_parquet:
+        # Sales is inferred from the first rows only, which may all look
+        # like integers, so read it as float up front
+        raw = pl.scan_csv(input_path, schema_overrides={sales_col: pl.Float64})
     
-    # Create daily aggregation
-    daily_df = df.groupby(date_col)[sales_col].sum().reset_index()
+    # Create daily aggregation in streaming mode; only the small
+    # daily result is converted to pandas
+    daily = (
+        raw.filter(pl.col(date_col).is_not_null())
+        .group_by(date_col)
+        .agg(pl.col(sales_col).sum())
+        .sort(date_col)
+        .collect(engine='streaming')
+    )
+    daily_df = daily.to_pandas()
     daily_df.columns = ['date', 'sales']
     daily_df['date'] = pd.to_datetime(daily_df['date'])
-    daily_df = daily_df.sort_values('date')
+    # Dates read from CSV are strings, so re-sort once they are parsed
+    daily_df = daily_df.sort_values('date', ignore_index=True)
     
     # Engineer features
     engineer = TimeSeriesFeatureEngineer(daily_df, date_col='date', target_col='sales')
     engineered = engineer.engineer_all_features()
     
     # Save
-    engineered.to_csv(output_path, index=False)
+    engineered.to_parquet(output_path, index=False, compression='zstd', compression_level=3)
     logger.info(f"✓ Saved engineered features to {output_path}")
     
+    # Copy to a temporary file and rename it into place, so an interrupted
+    # copy never leaves a truncated file under the cache name
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, suffix='.tmp')
+    os.close(fd)
+    try:
+        shutil.copyfile(output_path, tmp_path)
+        os.replace(tmp_path, cache_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    
     return engineered
 
 
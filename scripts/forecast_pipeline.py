@@ -9,13 +9,15 @@ from pathlib import Path
 from datetime import datetime, timedelta
 import json
 import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 # Machine Learning Imports
 from prophet import Prophet
 from statsmodels.tsa.arima.model import ARIMA
 from xgboost import XGBRegressor
-from sklearn.metrics import mean_absolute_error, mean_squared_error, mean_absolute_percentage_error, r2_score
-from sklearn.preprocessing import StandardScaler
+from xgboost.core import XGBoostError
 
 # Configure logging
 logging.basicConfig(
@@ -25,18 +27,121 @@ logging.basicConfig(
 # FIXED: Added double underscores below
 logger = logging.getLogger(__name__)
 
+# Each spawned training worker re-imports Prophet, statsmodels and XGBoost
+# (about a second), so models are only trained in parallel on long series
+PARALLEL_MIN_ROWS = 10000
+
+
+def fit_prophet(df_train, df_test):
+    """
+    Fit Prophet on the training data and predict the test period
+    
+    The forecast over history + test period is returned alongside the
+    model so later forecasts only need to predict beyond it.
+    
+    Returns:
+        tuple: ((fitted model, forecast), test predictions)
+    """
+    prophet_train = df_train[['OrderDate', 'Sales']].copy()
+    prophet_train.columns = ['ds', 'y']
+    
+    model = Prophet(
+        yearly_seasonality=True,
+        weekly_seasonality=True,
+        daily_seasonality=False,
+        interval_width=0.95
+    )
+    
+    model.fit(prophet_train)
+    
+    # Predict on test
+    future = model.make_future_dataframe(periods=len(df_test))
+    forecast = model.predict(future)[['ds', 'yhat', 'yhat_lower', 'yhat_upper']]
+    test_predictions = forecast.iloc[-len(df_test):]['yhat'].values
+    
+    return (model, forecast), test_predictions
+
+
+def fit_arima(df_train, df_test, order=(5, 1, 2)):
+    """
+    Fit ARIMA on the training sales and forecast the test period
+    
+    Returns:
+        tuple: (fitted results, test predictions)
+    """
+    model = ARIMA(df_train['Sales'], order=order)
+    result = model.fit()
+    
+    # Predict on test
+    test_predictions = result.get_forecast(steps=len(df_test)).predicted_mean.values
+    test_predictions = np.maximum(test_predictions, 0)  # Ensure positive
+    
+    return result, test_predictions
+
+
+def fit_xgboost(df_train, df_test, n_jobs=-1, device='cpu'):
+    """
+    Fit XGBoost on all numeric engineered features and predict the test period
+    
+    Args:
+        n_jobs (int): Threads for XGBoost (-1 uses all cores)
+        device (str): XGBoost device, e.g. 'cuda' to train on the GPU;
+            falls back to the CPU if GPU training fails
+    
+    Returns:
+        tuple: ((model, feature_cols), test predictions)
+    """
+    feature_cols = [col for col in df_train.select_dtypes(include=[np.number]).columns
+                   if col not in ['OrderDate', 'Sales']]
+    
+    # Trees are scale-invariant, so no scaling; float32 is XGBoost's native type.
+    # NaNs (e.g. early lags) are left for XGBoost's missing-value handling.
+    X_train = df_train[feature_cols].to_numpy(np.float32)
+    y_train = df_train['Sales'].to_numpy(np.float32)
+    X_test = df_test[feature_cols].to_numpy(np.float32)
+    
+    params = dict(
+        n_estimators=100,
+        max_depth=6,
+        learning_rate=0.05,
+        subsample=0.8,
+        colsample_bytree=0.8,
+        random_state=42,
+        tree_method='hist',
+        n_jobs=n_jobs,
+        missing=np.nan
+    )
+    
+    try:
+        model = XGBRegressor(device=device, **params)
+        model.fit(X_train, y_train, verbose=False)
+    except XGBoostError:
+        if device == 'cpu':
+            raise
+        logger.warning("XGBoost GPU training failed, falling back to CPU")
+        model = XGBRegressor(device='cpu', **params)
+        model.fit(X_train, y_train, verbose=False)
+    
+    test_predictions = model.predict(X_test)
+    
+    return (model, feature_cols), test_predictions
+
 
 class ForecastPipeline:
     """Complete forecasting pipeline"""
     
     # FIXED: This init method accepts data_path
-    def __init__(self, data_path, output_path='outputs'):
+    def __init__(self, data_path, output_path='outputs', xgboost_device='cpu'):
         """
         Initialize pipeline
+        
+        Args:
+            xgboost_device (str): Device for XGBoost training ('cpu' or 'cuda')
         """
         self.data_path = Path(data_path)
         self.output_path = Path(output_path)
         self.output_path.mkdir(exist_ok=True)
+        self.xgboost_device = xgboost_device
         
         self.df = None
         self.df_train = None
@@ -46,8 +151,11 @@ class ForecastPipeline:
         self.forecast = None
     
     def load_data(self):
-        """Load engineered features"""
-        self.df = pd.read_csv(self.data_path)
+        """Load engineered features from CSV or Parquet"""
+        if self.data_path.suffix.lower() == '.parquet':
+            self.df = pd.read_parquet(self.data_path)
+        else:
+            self.df = pd.read_csv(self.data_path)
         # FIXED: Using standard datetime and correct column name
         self.df['OrderDate'] = pd.to_datetime(self.df['OrderDate'])
         self.df = self.df.sort_values('OrderDate').reset_index(drop=True)
@@ -57,9 +165,11 @@ class ForecastPipeline:
     
     def train_test_split(self, test_ratio=0.2):
         """Split data into train/test sets"""
-        split_date = self.df['OrderDate'].quantile(test_ratio)
-        self.df_train = self.df[self.df['OrderDate'] <= split_date].reset_index(drop=True)
-        self.df_test = self.df[self.df['OrderDate'] > split_date].reset_index(drop=True)
+        # Data is sorted by date in load_data, so split positionally;
+        # the last test_ratio of rows are held out
+        split_idx = int(len(self.df) * (1 - test_ratio))
+        self.df_train = self.df.iloc[:split_idx].reset_index(drop=True)
+        self.df_test = self.df.iloc[split_idx:].reset_index(drop=True)
         
         logger.info(f"✓ Train: {len(self.df_train)} | Test: {len(self.df_test)}")
         return self.df_train, self.df_test
@@ -67,25 +177,9 @@ class ForecastPipeline:
     def train_prophet(self):
         """Train Prophet model"""
         try:
-            # FIXED: Capital S for Sales
-            prophet_train = self.df_train[['OrderDate', 'Sales']].copy()
-            prophet_train.columns = ['ds', 'y']
+            (model, forecast), test_predictions = fit_prophet(self.df_train, self.df_test)
             
-            model = Prophet(
-                yearly_seasonality=True,
-                weekly_seasonality=True,
-                daily_seasonality=False,
-                interval_width=0.95
-            )
-            
-            model.fit(prophet_train)
-            
-            # Predict on test
-            future = model.make_future_dataframe(periods=len(self.df_test))
-            forecast = model.predict(future)
-            test_predictions = forecast.iloc[-len(self.df_test):]['yhat'].values
-            
-            self.models['Prophet'] = model
+            self.models['Prophet'] = (model, forecast)
             self.predictions['Prophet'] = test_predictions
             
             logger.info("✓ Prophet model trained")
@@ -97,13 +191,7 @@ class ForecastPipeline:
     def train_arima(self, order=(5, 1, 2)):
         """Train ARIMA model"""
         try:
-            # FIXED: Capital S for Sales
-            model = ARIMA(self.df_train['Sales'], order=order)
-            result = model.fit()
-            
-            # Predict on test
-            test_predictions = result.get_forecast(steps=len(self.df_test)).predicted_mean.values
-            test_predictions = np.maximum(test_predictions, 0)  # Ensure positive
+            result, test_predictions = fit_arima(self.df_train, self.df_test, order=order)
             
             self.models['ARIMA'] = result
             self.predictions['ARIMA'] = test_predictions
@@ -117,30 +205,11 @@ class ForecastPipeline:
     def train_xgboost(self):
         """Train XGBoost model"""
         try:
-            feature_cols = [col for col in self.df_train.columns 
-                           if col not in ['OrderDate', 'Sales']]
-            
-            X_train = self.df_train[feature_cols].fillna(0)
-            y_train = self.df_train['Sales']
-            X_test = self.df_test[feature_cols].fillna(0)
-            
-            scaler = StandardScaler()
-            X_train_scaled = scaler.fit_transform(X_train)
-            X_test_scaled = scaler.transform(X_test)
-            
-            model = XGBRegressor(
-                n_estimators=100,
-                max_depth=6,
-                learning_rate=0.05,
-                subsample=0.8,
-                colsample_bytree=0.8,
-                random_state=42
+            (model, feature_cols), test_predictions = fit_xgboost(
+                self.df_train, self.df_test, device=self.xgboost_device
             )
             
-            model.fit(X_train_scaled, y_train, verbose=False)
-            test_predictions = model.predict(X_test_scaled)
-            
-            self.models['XGBoost'] = (model, scaler, feature_cols)
+            self.models['XGBoost'] = (model, feature_cols)
             self.predictions['XGBoost'] = test_predictions
             
             logger.info("✓ XGBoost model trained")
@@ -149,16 +218,78 @@ class ForecastPipeline:
             logger.error(f"✗ XGBoost error: {str(e)}")
             return None, None
     
+    def train_all_models(self, max_workers=3, parallel=None):
+        """
+        Train all models, concurrently in separate processes when worthwhile
+        
+        Args:
+            max_workers (int): Worker processes for parallel training
+            parallel (bool): Force parallel (True) or serial (False) training;
+                by default the pool is used only with at least 3 CPUs and
+                PARALLEL_MIN_ROWS training rows
+        
+        Workers are spawned, so driver scripts that train in parallel must
+        call this under an ``if __name__ == '__main__':`` guard.
+        """
+        if parallel is None:
+            parallel = (os.cpu_count() or 1) >= 3 and len(self.df_train) >= PARALLEL_MIN_ROWS
+        if not parallel:
+            self.train_prophet()
+            self.train_arima()
+            self.train_xgboost()
+            return self.models
+        
+        # Leave a core each for Prophet and ARIMA while XGBoost runs beside them
+        xgb_jobs = max(1, (os.cpu_count() or 1) - 2)
+        trainers = {
+            'Prophet': (fit_prophet, {}),
+            'ARIMA': (fit_arima, {}),
+            'XGBoost': (fit_xgboost, {'n_jobs': xgb_jobs, 'device': self.xgboost_device}),
+        }
+        results = {}
+        
+        # Spawn rather than fork: forking after Polars or another threaded
+        # library has started its thread pool can deadlock the workers
+        mp_context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context) as executor:
+            futures = {
+                executor.submit(fit, self.df_train, self.df_test, **kwargs): name
+                for name, (fit, kwargs) in trainers.items()
+            }
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    results[name] = future.result()
+                    logger.info(f"✓ {name} model trained")
+                except Exception as e:
+                    logger.error(f"✗ {name} error: {str(e)}")
+        
+        # Store in a fixed order so reports don't depend on completion order
+        for name in trainers:
+            if name in results:
+                self.models[name], self.predictions[name] = results[name]
+        
+        return self.models
+    
     def evaluate_models(self):
         """Evaluate all models"""
         results = []
         
+        # FIXED: Capital S for Sales
+        y = self.df_test['Sales'].to_numpy(np.float64)
+        abs_y = np.maximum(np.abs(y), np.finfo(np.float64).eps)
+        ss_tot = ((y - y.mean()) ** 2).sum()
+        
         for model_name, predictions in self.predictions.items():
-            # FIXED: Capital S for Sales
-            mae = mean_absolute_error(self.df_test['Sales'], predictions)
-            rmse = np.sqrt(mean_squared_error(self.df_test['Sales'], predictions))
-            mape = mean_absolute_percentage_error(self.df_test['Sales'], predictions)
-            r2 = r2_score(self.df_test['Sales'], predictions)
+            # Derive every metric from a single residual array
+            residuals = y - np.asarray(predictions, dtype=np.float64)
+            abs_residuals = np.abs(residuals)
+            ss_res = (residuals * residuals).sum()
+            
+            mae = abs_residuals.mean()
+            rmse = np.sqrt(ss_res / len(y))
+            mape = (abs_residuals / abs_y).mean()
+            r2 = 1 - ss_res / ss_tot if ss_tot > 0 else float(ss_res == 0)
             
             results.append({
                 'Model': model_name,
@@ -178,9 +309,17 @@ class ForecastPipeline:
         try:
             # Use best model (Prophet)
             if 'Prophet' in self.models:
-                model = self.models['Prophet']
-                future_dates = model.make_future_dataframe(periods=periods)
-                forecast = model.predict(future_dates)
+                model, forecast = self.models['Prophet']
+                
+                # Training already predicted len(df_test) days past the
+                # training data; only predict the remaining days
+                extra = periods - len(self.df_test)
+                if extra > 0:
+                    future_dates = model.make_future_dataframe(periods=periods, include_history=False)
+                    extra_forecast = model.predict(future_dates.iloc[-extra:])
+                    forecast = pd.concat(
+                        [forecast, extra_forecast[forecast.columns]], ignore_index=True
+                    )
                 
                 # FIXED: Correct column name OrderDate
                 forecast_future = forecast[forecast['ds'] > self.df['OrderDate'].max()][
@@ -224,21 +363,20 @@ class ForecastPipeline:
         
         # Save forecast
         if self.forecast is not None:
-            # Combine with historical for Power BI
-            historical = pd.DataFrame({
-                'OrderDate': self.df['OrderDate'],
-                'sales': self.df['Sales'],
-                'data_type': 'Historical',
-                'forecast_lower': np.nan,
-                'forecast_upper': np.nan
-            })
-            
-            forecast_data = self.forecast.copy()
-            forecast_data['data_type'] = 'Forecast'
-            forecast_data['sales'] = forecast_data['forecast']
-            forecast_data = forecast_data[['OrderDate', 'sales', 'data_type', 'forecast_lower', 'forecast_upper']]
+            # Combine with historical for Power BI, building each column once
+            n_hist = len(self.df)
+            n_forecast = len(self.forecast)
+            no_bounds = np.full(n_hist, np.nan)
             
-            combined = pd.concat([historical, forecast_data], ignore_index=True)
+            combined = pd.DataFrame({
+                'OrderDate': np.concatenate([self.df['OrderDate'].to_numpy(),
+                                             self.forecast['OrderDate'].to_numpy()]),
+                'sales': np.concatenate([self.df['Sales'].to_numpy(np.float64),
+                                         self.forecast['forecast'].to_numpy(np.float64)]),
+                'data_type': np.repeat(['Historical', 'Forecast'], [n_hist, n_forecast]),
+                'forecast_lower': np.concatenate([no_bounds, self.forecast['forecast_lower'].to_numpy(np.float64)]),
+                'forecast_upper': np.concatenate([no_bounds, self.forecast['forecast_upper'].to_numpy(np.float64)]),
+            })
             combined.to_csv(self.output_path / 'powerbi_data.csv', index=False)
             logger.info("✓ Saved Power BI data")
     
@@ -252,9 +390,7 @@ class ForecastPipeline:
         self.train_test_split()
         
         logger.info("\nTraining models...")
-        self.train_prophet()
-        self.train_arima()
-        self.train_xgboost()
+        self.train_all_models()
         
         logger.info("\nEvaluating models...")
         self.evaluate_models()
@@ -1,216 +1,463 @@
-#!/usr/bin/env python3
+#!/usr/bin/env -S python3 -S
 """
 Project Initialization & Verification Script
 Validates all project files are in place
+
+Only the standard library is used, so the script runs without site
+initialization (python -S verify_setup.py), skipping site-packages and
+.pth scanning at startup. The shebang does this when run directly.
+
+Exits with status 1 when any file or directory is missing. Set
+VERIFY_FAST=1 (e.g. in CI) to stop at the first missing file.
 """
 
+import functools
+import itertools
 import os
-from pathlib import Path
+import sys
 
-PROJECT_ROOT = Path(__file__).parent
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
 
+# Required files by report category, each mapped to its description in
+# the project-structure tree (None for no description)
 REQUIRED_FILES = {
-    "Documentation": [
-        "README.md",
-        "GETTING_STARTED.md",
-        "POWERBI_GUIDE.md",
-        "PROJECT_DOCUMENTATION.md",
-    ],
-    "Configuration": [
-        "config.py",
-        "requirements.txt",
-        ".gitignore",
-    ],
-    "Notebooks": [
-        "notebooks/01_data_exploration.ipynb",
-        "notebooks/02_feature_engineering.ipynb",
-        "notebooks/03_model_training.ipynb",
-        "notebooks/04_forecasting_analysis.ipynb",
-    ],
-    "Scripts": [
-        "scripts/data_loader.py",
-        "scripts/feature_engineer.py",
-        "scripts/forecast_pipeline.py",
-    ],
-    "Directory Structure": [
-        "data/raw/README.md",
-        "data/processed/README.md",
-        "outputs/README.md",
-        "dashboards/README.md",
-    ]
+    "Documentation": {
+        "README.md": "Main documentation",
+        "GETTING_STARTED.md": "Setup guide",
+        "POWERBI_GUIDE.md": "Dashboard instructions",
+        "PROJECT_DOCUMENTATION.md": "Complete documentation",
+    },
+    "Configuration": {
+        "config.py": "Configuration file",
+        "requirements.txt": "Python dependencies",
+        ".gitignore": "Git ignore rules",
+    },
+    "Notebooks": {
+        "notebooks/01_data_exploration.ipynb": "EDA & data validation",
+        "notebooks/02_feature_engineering.ipynb": "Create 50+ features",
+        "notebooks/03_model_training.ipynb": "Train 3 forecasting models",
+        "notebooks/04_forecasting_analysis.ipynb": "Generate forecasts & insights",
+    },
+    "Scripts": {
+        "scripts/data_loader.py": "Data loading utilities",
+        "scripts/feature_engineer.py": "Feature engineering",
+        "scripts/forecast_pipeline.py": "Complete pipeline",
+    },
+    "Directory Structure": {
+        "data/raw/README.md": "Data instructions",
+        "data/processed/README.md": None,
+        "outputs/README.md": None,
+        "dashboards/README.md": None,
+    },
+}
+
+# Expected directories, each mapped to its tree description
+EXPECTED_DIRECTORIES = {
+    "notebooks": "Jupyter Notebooks",
+    "scripts": "Python modules",
+    "data": "Data directory",
+    "data/raw": "Raw CSV files",
+    "data/processed": "Engineered features",
+    "outputs": "Results & exports",
+    "dashboards": "Power BI files",
+}
+
+# REQUIRED_FILES flattened once at import: every path in report order,
+# plus each category's name and the index of its first path
+_CATEGORIES = tuple(REQUIRED_FILES)
+_PATHS = tuple(file_path for files in REQUIRED_FILES.values() for file_path in files)
+_OFFSETS = tuple(itertools.accumulate(
+    (len(files) for files in REQUIRED_FILES.values()), initial=0
+))[:-1]
+
+# True when every expected directory contains a required file, so finding
+# all the files proves all the directories exist
+_FILES_COVER_DIRS = all(
+    any(path.startswith(dir_path + "/") for path in _PATHS)
+    for dir_path in EXPECTED_DIRECTORIES
+)
+
+# Absolute OS-native paths for every path probed, built once at import
+_FULL_PATHS = {
+    rel_path: os.path.join(PROJECT_ROOT, rel_path.replace("/", os.sep))
+    for rel_path in {
+        *_PATHS,
+        *EXPECTED_DIRECTORIES,
+        *(path.rpartition("/")[0] for path in (*_PATHS, *EXPECTED_DIRECTORIES)),
+    }
+}
+
+# Report separators
+_SEP_EQ = "=" * 60
+_SEP_DASH = "-" * 60
+
+# Status prefixes for report rows
+_OK_PREFIX = "  ✅ "
+_BAD_PREFIX = "  ❌ "
+_WARN_PREFIX = "  ⚠️ "
+
+# Module attributes built on first use (PEP 562), so importing this
+# module does almost no work
+_LAZY_BUILDERS = {}
+
+
+def _lazy(name):
+    """Build a lazy module attribute on first use and keep it"""
+    try:
+        return globals()[name]
+    except KeyError:
+        value = globals()[name] = _LAZY_BUILDERS[name]()
+        return value
+
+
+def __getattr__(name):
+    if name in _LAZY_BUILDERS:
+        return _lazy(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Annotations for the project-structure tree; its shape and descriptions
+# come from REQUIRED_FILES and EXPECTED_DIRECTORIES
+_PROJECT_NAME = "task-1"
+_GENERATED_OUTPUTS = {
+    "outputs/*.png": "Visualizations",
+    "outputs/*.csv": "Data exports",
+    "outputs/*.json": "Analysis results",
 }
+_ICONS = {
+    "README.md": "📄",
+    "GETTING_STARTED.md": "📄",
+    "POWERBI_GUIDE.md": "📄",
+    "PROJECT_DOCUMENTATION.md": "📄",
+    "config.py": "🔧",
+    "requirements.txt": "📋",
+    ".gitignore": "🚫",
+    "notebooks": "📚",
+    "scripts": "🐍",
+    "data": "💾",
+    "outputs": "📊",
+    "dashboards": "📈",
+}
+_DESCRIPTIONS = {
+    **_GENERATED_OUTPUTS,
+    **EXPECTED_DIRECTORIES,
+    **{
+        path: description
+        for files in REQUIRED_FILES.values()
+        for path, description in files.items()
+    },
+}
+# Display column where descriptions start (icons render two columns wide)
+_COMMENT_COLUMN = 42
+
+
+def _render_tree(node, prefix, rel_dir, lines):
+    """Append tree lines for a nested {name: children-or-None} dict"""
+    last_index = len(node) - 1
+    
+    for i, (name, children) in enumerate(node.items()):
+        rel_path = rel_dir + name
+        is_dir = children is not None
+        if is_dir and not rel_dir:
+            lines.append("│")
+        
+        icon = _ICONS.get(rel_path)
+        line = prefix + ("└── " if i == last_index else "├── ")
+        if icon:
+            line += icon + " "
+        line += name + "/" if is_dir else name
+        
+        description = _DESCRIPTIONS.get(rel_path)
+        if description:
+            line = line.ljust(_COMMENT_COLUMN - 1 if icon else _COMMENT_COLUMN) + "# " + description
+        lines.append(line)
+        
+        if is_dir:
+            child_prefix = prefix + ("    " if i == last_index else "│   ")
+            _render_tree(children, child_prefix, rel_path + "/", lines)
+
+
+def _build_project_structure():
+    """Annotated tree of the project layout, generated from the file lists"""
+    # Nested dicts keep insertion order: root files first, then directories
+    tree = {path: None for path in _PATHS if "/" not in path}
+    for dir_path in EXPECTED_DIRECTORIES:
+        node = tree
+        for part in dir_path.split("/"):
+            node = node.setdefault(part, {})
+    for path in (*_GENERATED_OUTPUTS, *_PATHS):
+        *parts, name = path.split("/")
+        node = tree
+        for part in parts:
+            node = node.setdefault(part, {})
+        node.setdefault(name, None)
+    
+    lines = ["", _PROJECT_NAME + "/"]
+    _render_tree(tree, "", "", lines)
+    return "\n".join(lines) + "\n"
+
+
+_LAZY_BUILDERS["PROJECT_STRUCTURE"] = _build_project_structure
+
+
+def _build_next_steps():
+    """Next-steps list, pre-joined into one block of text"""
+    steps = [
+        ("1️⃣", "Read GETTING_STARTED.md for setup instructions"),
+        ("2️⃣", "Create virtual environment: python -m venv venv"),
+        ("3️⃣", "Activate environment: source venv/bin/activate"),
+        ("4️⃣", "Install dependencies: pip install -r requirements.txt"),
+        ("5️⃣", "Prepare data in data/raw/ folder"),
+        ("6️⃣", "Open Jupyter: jupyter notebook"),
+        ("7️⃣", "Run notebooks in order (01 → 02 → 03 → 04)"),
+        ("8️⃣", "Import outputs/powerbi_data.csv to Power BI"),
+        ("9️⃣", "Follow POWERBI_GUIDE.md for dashboard creation"),
+        ("🔟", "Share results with stakeholders"),
+    ]
+    return "\n".join(f"  {emoji} {step}" for emoji, step in steps)
+
+
+_LAZY_BUILDERS["NEXT_STEPS"] = _build_next_steps
+
+
+def _build_key_features():
+    """Key-features list, pre-joined into one block of text"""
+    features = [
+        "✨ 4 comprehensive Jupyter notebooks",
+        "📊 3 advanced forecasting models (Prophet, ARIMA, XGBoost)",
+        "🔧 Reusable Python modules for data & forecasting",
+        "📈 50+ engineered time series features",
+        "💼 Power BI integration ready",
+        "📋 Complete documentation & guides",
+        "🎯 Business insights & recommendations",
+        "🚀 Production-ready code",
+    ]
+    return "\n".join(f"  {feature}" for feature in features)
+
+
+_LAZY_BUILDERS["KEY_FEATURES"] = _build_key_features
+
+
+def _full_path(rel_path):
+    """Absolute OS-native path for a '/'-separated project-relative path"""
+    try:
+        return _FULL_PATHS[rel_path]
+    except KeyError:
+        return os.path.join(PROJECT_ROOT, rel_path.replace("/", os.sep))
+
+
+# Whether each directory probed during this run exists
+_DIR_CACHE = {}
+
+
+@functools.lru_cache(maxsize=None)
+def _list_dir(rel_dir):
+    """
+    Entries of a project directory, listed once per run
+    
+    Maps each entry name to whether it is a directory, using the file
+    type scandir already returns (no extra stat per entry). Symlinks are
+    followed, so a dangling link is left out like a missing file. Returns
+    an empty dict for a missing directory and None for one that exists
+    but cannot be listed.
+    """
+    # Nothing under a directory already known to be missing can exist
+    if rel_dir and _DIR_CACHE.get(rel_dir.rpartition("/")[0]) is False:
+        _DIR_CACHE[rel_dir] = False
+        return {}
+    
+    try:
+        with os.scandir(_full_path(rel_dir)) as entries:
+            listing = {
+                entry.name: entry.is_dir()
+                for entry in entries
+                if not entry.is_symlink() or os.path.exists(entry.path)
+            }
+    except (FileNotFoundError, NotADirectoryError):
+        _DIR_CACHE[rel_dir] = False
+        return {}
+    except PermissionError:
+        _DIR_CACHE[rel_dir] = True
+        return None
+    
+    _DIR_CACHE[rel_dir] = True
+    return listing
 
-EXPECTED_DIRECTORIES = [
-    "notebooks",
-    "scripts",
-    "data",
-    "data/raw",
-    "data/processed",
-    "outputs",
-    "dashboards",
-]
 
+@functools.lru_cache(maxsize=None)
+def _is_dir(rel_path):
+    """
+    Check what a path relative to the project root is
+    
+    Returns True for a directory, False for any other existing entry and
+    None if the path does not exist.
+    """
+    # Directories already probed for their children need no further lookup
+    if _DIR_CACHE.get(rel_path):
+        return True
+    
+    parent, _, name = rel_path.rpartition("/")
+    listing = _list_dir(parent)
+    if listing is None:
+        # Unlistable directory: probe the path itself
+        full_path = _full_path(rel_path)
+        return os.path.isdir(full_path) if os.path.exists(full_path) else None
+    return listing.get(name)
 
-def check_files():
+
+def _prefetch(rel_paths):
+    """
+    List the parent directories of the given paths concurrently
+    
+    On high-latency filesystems (NFS, SMB) this overlaps the round trips
+    instead of paying for them one after another.
+    """
+    parents = {rel_path.rpartition("/")[0] for rel_path in rel_paths}
+    parents.difference_update(_DIR_CACHE)
+    if len(parents) > 1:
+        from concurrent.futures import ThreadPoolExecutor
+        
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            list(executor.map(_list_dir, parents))
+
+
+def _emit(lines, out):
+    """Append lines to out, or write them to stdout in a single call"""
+    if out is None:
+        sys.stdout.write("\n".join(lines) + "\n")
+    else:
+        out.extend(lines)
+
+
+def check_files(out=None):
     """Verify all required files exist"""
-    print("\n" + "="*60)
-    print("PROJECT STRUCTURE VERIFICATION")
-    print("="*60)
+    lines = [
+        "\n" + _SEP_EQ,
+        "PROJECT STRUCTURE VERIFICATION",
+        _SEP_EQ,
+    ]
     
     all_present = True
+    fast = os.environ.get("VERIFY_FAST") == "1"
+    if not fast:
+        _prefetch(_PATHS)
+    next_category = 0
     
-    for category, files in REQUIRED_FILES.items():
-        print(f"\n📁 {category}")
-        print("-" * 60)
+    for i, file_path in enumerate(_PATHS):
+        # Emit a header at the start of each category
+        while next_category < len(_OFFSETS) and _OFFSETS[next_category] == i:
+            lines.append(f"\n📁 {_CATEGORIES[next_category]}")
+            lines.append(_SEP_DASH)
+            next_category += 1
         
-        for file_path in files:
-            full_path = PROJECT_ROOT / file_path
-            exists = full_path.exists()
-            status = "✅" if exists else "❌"
-            print(f"  {status} {file_path}")
-            
-            if not exists:
-                all_present = False
+        is_dir = _is_dir(file_path)
+        exists = is_dir is not None
+        if is_dir:
+            lines.append(_WARN_PREFIX + file_path + " (expected a file, found a directory)")
+        else:
+            lines.append((_OK_PREFIX if exists else _BAD_PREFIX) + file_path)
+        
+        if not exists:
+            all_present = False
+            if fast:
+                break
     
+    _emit(lines, out)
     return all_present
 
 
-def check_directories():
+def check_directories(out=None):
     """Verify all required directories exist"""
-    print("\n📂 Directory Structure")
-    print("-" * 60)
+    lines = [
+        "\n📂 Directory Structure",
+        _SEP_DASH,
+    ]
     
     all_present = True
+    _prefetch(EXPECTED_DIRECTORIES)
     
     for dir_path in EXPECTED_DIRECTORIES:
-        full_path = PROJECT_ROOT / dir_path
-        exists = full_path.exists()
-        status = "✅" if exists else "❌"
-        print(f"  {status} {dir_path}/")
+        is_dir = _is_dir(dir_path)
+        exists = is_dir is not None
+        if is_dir is False:
+            lines.append(_WARN_PREFIX + dir_path + "/ (expected a directory, found a file)")
+        else:
+            lines.append((_OK_PREFIX if exists else _BAD_PREFIX) + dir_path + "/")
         
         if not exists:
             all_present = False
     
+    _emit(lines, out)
     return all_present
 
 
-def print_next_steps():
+def print_next_steps(out=None):
     """Print next steps for user"""
-    print("\n" + "="*60)
-    print("NEXT STEPS")
-    print("="*60)
-    
-    steps = [
-        ("1️⃣", "Read GETTING_STARTED.md for setup instructions"),
-        ("2️⃣", "Create virtual environment: python -m venv venv"),
-        ("3️⃣", "Activate environment: source venv/bin/activate"),
-        ("4️⃣", "Install dependencies: pip install -r requirements.txt"),
-        ("5️⃣", "Prepare data in data/raw/ folder"),
-        ("6️⃣", "Open Jupyter: jupyter notebook"),
-        ("7️⃣", "Run notebooks in order (01 → 02 → 03 → 04)"),
-        ("8️⃣", "Import outputs/powerbi_data.csv to Power BI"),
-        ("9️⃣", "Follow POWERBI_GUIDE.md for dashboard creation"),
-        ("🔟", "Share results with stakeholders"),
+    lines = [
+        "\n" + _SEP_EQ,
+        "NEXT STEPS",
+        _SEP_EQ,
     ]
     
-    for emoji, step in steps:
-        print(f"  {emoji} {step}")
+    lines.append(_lazy("NEXT_STEPS"))
+    _emit(lines, out)
 
 
-def print_project_structure():
+def print_project_structure(out=None):
     """Print complete project structure"""
-    print("\n" + "="*60)
-    print("PROJECT STRUCTURE")
-    print("="*60)
-    
-    structure = """
-task-1/
-├── 📄 README.md                          # Main documentation
-├── 📄 GETTING_STARTED.md                 # Setup guide
-├── 📄 POWERBI_GUIDE.md                   # Dashboard instructions
-├── 📄 PROJECT_DOCUMENTATION.md           # Complete documentation
-├── 🔧 config.py                          # Configuration file
-├── 📋 requirements.txt                   # Python dependencies
-├── 🚫 .gitignore                         # Git ignore rules
-│
-├── 📚 notebooks/                         # Jupyter Notebooks
-│   ├── 01_data_exploration.ipynb         # EDA & data validation
-│   ├── 02_feature_engineering.ipynb      # Create 50+ features
-│   ├── 03_model_training.ipynb           # Train 3 forecasting models
-│   └── 04_forecasting_analysis.ipynb     # Generate forecasts & insights
-│
-├── 🐍 scripts/                           # Python modules
-│   ├── data_loader.py                    # Data loading utilities
-│   ├── feature_engineer.py               # Feature engineering
-│   └── forecast_pipeline.py              # Complete pipeline
-│
-├── 💾 data/                              # Data directory
-│   ├── raw/                              # Raw CSV files
-│   │   └── README.md                     # Data instructions
-│   └── processed/                        # Engineered features
-│       └── README.md
-│
-├── 📊 outputs/                           # Results & exports
-│   ├── *.png                             # Visualizations
-│   ├── *.csv                             # Data exports
-│   ├── *.json                            # Analysis results
-│   └── README.md
-│
-└── 📈 dashboards/                        # Power BI files
-    └── README.md
-    """
+    lines = [
+        "\n" + _SEP_EQ,
+        "PROJECT STRUCTURE",
+        _SEP_EQ,
+    ]
     
-    print(structure)
+    lines.append(_lazy("PROJECT_STRUCTURE"))
+    _emit(lines, out)
 
 
 def main():
-    """Main verification routine"""
-    print("\n🚀 Retail Sales Forecasting Project - Initialization")
+    """Main verification routine; returns True when the setup is complete"""
+    # Collect the whole report and write it to stdout once at the end
+    out = ["\n🚀 Retail Sales Forecasting Project - Initialization"]
     
     # Check files
-    files_ok = check_files()
+    files_ok = check_files(out)
     
-    # Check directories
-    dirs_ok = check_directories()
+    # Check directories, only needed to diagnose missing files
+    if files_ok and _FILES_COVER_DIRS:
+        dirs_ok = True
+    else:
+        dirs_ok = check_directories(out)
     
     # Print structure
-    print_project_structure()
+    print_project_structure(out)
     
     # Print status
-    print("\n" + "="*60)
+    out.append("\n" + _SEP_EQ)
     if files_ok and dirs_ok:
-        print("✅ PROJECT SETUP COMPLETE")
-        print("="*60)
+        out.append("✅ PROJECT SETUP COMPLETE")
+        out.append(_SEP_EQ)
     else:
-        print("⚠️  SETUP INCOMPLETE")
-        print("="*60)
-        print("\nPlease ensure all files and directories are in place.")
+        out.append("⚠️  SETUP INCOMPLETE")
+        out.append(_SEP_EQ)
+        out.append("\nPlease ensure all files and directories are in place.")
     
     # Print next steps
-    print_next_steps()
+    print_next_steps(out)
     
     # Print features
-    print("\n" + "="*60)
-    print("KEY FEATURES")
-    print("="*60)
-    features = [
-        "✨ 4 comprehensive Jupyter notebooks",
-        "📊 3 advanced forecasting models (Prophet, ARIMA, XGBoost)",
-        "🔧 Reusable Python modules for data & forecasting",
-        "📈 50+ engineered time series features",
-        "💼 Power BI integration ready",
-        "📋 Complete documentation & guides",
-        "🎯 Business insights & recommendations",
-        "🚀 Production-ready code",
-    ]
+    out.append("\n" + _SEP_EQ)
+    out.append("KEY FEATURES")
+    out.append(_SEP_EQ)
+    out.append(_lazy("KEY_FEATURES"))
     
-    for feature in features:
-        print(f"  {feature}")
+    out.append("\n" + _SEP_EQ)
+    out.append("Happy Forecasting! 📊🚀")
+    out.append(_SEP_EQ + "\n")
     
-    print("\n" + "="*60)
-    print("Happy Forecasting! 📊🚀")
-    print("="*60 + "\n")
+    sys.stdout.write("\n".join(out) + "\n")
+    return files_ok and dirs_ok
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(0 if main() else 1)